@@ -7,203 +7,422 @@ Sentences: SentenceNode
 Author:  Ian Fisher (iafisher@protonmail.com)
 Version: September 2018
 """
+import sys
 from collections import namedtuple
+from typing import Any, Dict, Tuple
 
 
+# Caches of interned Var, ComplexType and AtomicType objects, keyed by their fields.
+_interned_vars: Dict[str, "Var"] = {}
+_interned_types: Dict[Tuple[Any, ...], "ComplexType"] = {}
+_interned_atomic_types: Dict[str, "AtomicType"] = {}
+
+# Variables are created for every unknown word that is translated, and types for every
+# type expression that is parsed, so the tables of interned variables and complex types
+# are capped to keep a long-running shell from growing them without bound. (The nodes
+# are tuples, which cannot be weakly referenced.)
+MAX_INTERNED_VARS = 10000
+MAX_INTERNED_TYPES = 10000
+
 # Below are defined the classes to represent logical formulas as trees.
 
 
 class Formula:
+    # Whether the formula binds a variable. For all the formula classes that do, the
+    # name of the bound variable is the first field.
+    binds_variable = False
+
+    @property
+    def subformula_fields(self):
+        """The positions of the subformulas among the fields of the formula, e.g. (1,)
+        for a Lambda, whose body is its second field.
+
+        The formula classes below override this with a class attribute, so that the
+        iterative tree walks can find the children of a node without any per-field
+        isinstance checks.
+        """
+        return tuple(i for i, c in enumerate(self) if isinstance(c, Formula))
+
+    @property
+    def free_vars(self):
+        """The names of the variables that occur unbound in the formula, as a frozenset
+        of strings.
+
+        The set is computed on first access and then cached on the node, which is safe
+        because formulas are immutable.
+        """
+        try:
+            return self._free_vars
+        except AttributeError:
+            cache_bottom_up(self, "_free_vars", "compute_free_vars")
+            return self._free_vars
+
+    def compute_free_vars(self):
+        """Compute the set of free variables from scratch.
+
+        The default implementation takes the union of the free variables of all
+        children. Subclasses may need to override this implementation.
+        """
+        return frozenset().union(*(c.free_vars for c in self if isinstance(c, Formula)))
+
     def replace_variable(self, variable, replacement):
         """Replace all unbound instances of `variable`, a string, with `replacement`.
 
-        The default implementation recursively replaces the variable in all children.
-        Subclasses may need to override this implementation.
+        If `variable` does not occur free in the formula, the formula itself is returned
+        without being traversed.
         """
-        children = [
-            c.replace_variable(variable, replacement) if isinstance(c, Formula) else c
-            for c in self
-        ]
-        return self.__class__(*children)
+        return replace_variables_iter(self, {variable: replacement})
+
+    def replace_variables(self, substitutions):
+        """Replace all unbound instances of each variable named in `substitutions`, a
+        dictionary from strings to formulas, with its replacement.
+
+        The replacements are made simultaneously in a single traversal, so a replacement
+        is never itself subject to substitution.
+        """
+        return replace_variables_iter(self, substitutions)
 
     def simplify(self):
         """Simplify the tree by lambda conversion.
 
+        Like free_vars, the simplified tree is computed on first use and then cached on
+        the node, so that subformulas shared between trees, e.g. lexicon entries that
+        occur in many translations, are only simplified once.
+        """
+        try:
+            return self._simplified
+        except AttributeError:
+            cache_bottom_up(self, "_simplified", "compute_simplified")
+            return self._simplified
+
+    def compute_simplified(self):
+        """Simplify the tree from scratch.
+
         The default implementation recursively simplifies each child. Subclasses may
         need to override this implementation.
         """
         children = [c.simplify() if isinstance(c, Formula) else c for c in self]
+        if all(new is old for new, old in zip(children, self)):
+            return self
         return self.__class__(*children)
 
-    def ascii_str(self):
-        """Render the formula as a string containing only ASCII characters.
+    def __str__(self):
+        # Like free_vars, the string forms of a formula are computed once and cached on
+        # the node.
+        try:
+            return self._str
+        except AttributeError:
+            buf = []
+            self.write(buf, False)
+            self._str = "".join(buf)
+            return self._str
 
-        The default implementation falls back to __str__. Subclasses whose __str__
-        contains non-ASCII characters should override this method.
+    def ascii_str(self):
+        """Render the formula as a string containing only ASCII characters."""
+        try:
+            return self._ascii_str
+        except AttributeError:
+            buf = []
+            self.write(buf, True)
+            self._ascii_str = "".join(buf)
+            return self._ascii_str
+
+    def write(self, buf, ascii):
+        """Append the string representation of the formula to `buf`, a list of strings,
+        using only ASCII characters if `ascii` is true.
+
+        Subclasses write their children into the same list rather than calling str on
+        them and concatenating the results, so that rendering a tree allocates only the
+        fragments and the final string. Every subclass must implement this method.
         """
-        return str(self)
+        raise NotImplementedError
 
 
 class Var(Formula, namedtuple("Var", ["value"])):
     prec = 1
-
-    def __str__(self):
-        return self.value
-
-    def replace_variable(self, variable, replacement):
-        return self if variable != self.value else replacement
+    subformula_fields = ()
+
+    def __new__(cls, value):
+        # Variables are interned, so that e.g. every Var("x") is the same object. This
+        # saves allocations, and lets tuple comparison of larger trees short-circuit on
+        # identity when it reaches a shared variable.
+        # The name itself is interned as a plain string too, so that names built by hand,
+        # e.g. by default_for_unknown, are shared just like the ones the parser produces.
+        value = sys.intern(str(value))
+        if cls is not Var:
+            return super().__new__(cls, value)
+
+        var = _interned_vars.get(value)
+        if var is None:
+            var = super().__new__(cls, value)
+            # Past the cap, new variables are simply not interned. They still compare
+            # equal to each other, just not by identity.
+            if len(_interned_vars) < MAX_INTERNED_VARS:
+                _interned_vars[value] = var
+        return var
+
+    def write(self, buf, ascii):
+        buf.append(self.value)
+
+    def compute_free_vars(self):
+        return frozenset([self.value])
 
 
 class And(Formula, namedtuple("And", ["left", "right"])):
     prec = 2
+    subformula_fields = (0, 1)
 
-    def __str__(self):
-        # wrapb applies brackets if needed for the proper precedence.
-        left = wrapb(self, self.left)
-        right = wrapb(self, self.right)
-        return left + " & " + right
+    def write(self, buf, ascii):
+        write_binary(buf, self, " & ", ascii)
 
 
 class Or(Formula, namedtuple("Or", ["left", "right"])):
     prec = 3
+    subformula_fields = (0, 1)
 
-    def __str__(self):
-        left = wrapb(self, self.left)
-        right = wrapb(self, self.right)
-        return left + " | " + right
+    def write(self, buf, ascii):
+        write_binary(buf, self, " | ", ascii)
 
 
 class IfThen(Formula, namedtuple("IfThen", ["left", "right"])):
     prec = 4
+    subformula_fields = (0, 1)
 
-    def __str__(self):
-        left = wrapb(self, self.left)
-        right = wrapb(self, self.right)
-        return left + " -> " + right
+    def write(self, buf, ascii):
+        write_binary(buf, self, " -> ", ascii)
 
 
 class IfAndOnlyIf(Formula, namedtuple("IfAndOnlyIf", ["left", "right"])):
     prec = 4
+    subformula_fields = (0, 1)
 
-    def __str__(self):
-        left = wrapb(self, self.left)
-        right = wrapb(self, self.right)
-        return left + " <-> " + right
+    def write(self, buf, ascii):
+        write_binary(buf, self, " <-> ", ascii)
 
 
 class Not(Formula, namedtuple("Not", ["operand"])):
     prec = 1
+    subformula_fields = (0,)
 
-    def __str__(self):
-        operand = wrapb(self, self.operand)
-        return "~" + operand
+    def write(self, buf, ascii):
+        buf.append("~")
+        write_wrapped(buf, self, self.operand, ascii)
 
 
 class Lambda(Formula, namedtuple("Lambda", ["parameter", "body"])):
     prec = 5
+    subformula_fields = (1,)
+    binds_variable = True
 
-    def __str__(self):
-        return "λ{0.parameter}.{0.body}".format(self)
-
-    def ascii_str(self):
-        return "L{0.parameter}.{0.body}".format(self)
+    def write(self, buf, ascii):
+        buf.append("L" if ascii else "λ")
+        buf.append(self.parameter)
+        buf.append(".")
+        self.body.write(buf, ascii)
 
-    def replace_variable(self, variable, replacement):
-        if variable != self.parameter:
-            return Lambda(
-                self.parameter, self.body.replace_variable(variable, replacement)
-            )
-        else:
-            return self
+    def compute_free_vars(self):
+        return self.body.free_vars - {self.parameter}
 
 
 class Call(Formula, namedtuple("Call", ["caller", "arg"])):
     prec = 1
+    subformula_fields = (0, 1)
 
-    def __str__(self):
+    def write(self, buf, ascii):
         # To make string representations more natural, F(x)(y) is printed as F(x, y),
         # which is why this method is more complicated than you would expect.
-        args = [str(self.arg)]
+        args = [self.arg]
         func = self.caller
         while isinstance(func, Call):
-            args.append(str(func.arg))
+            args.append(func.arg)
             func = func.caller
-        args = ", ".join(reversed(args))
+
         if isinstance(func, Var):
-            return "{}({})".format(func, args)
+            func.write(buf, ascii)
         else:
             # Syntactically, a non-constant function must be in parentheses in a call
             # expression.
-            return "({})({})".format(func, args)
+            buf.append("(")
+            func.write(buf, ascii)
+            buf.append(")")
+
+        buf.append("(")
+        for i, arg in enumerate(reversed(args)):
+            if i > 0:
+                buf.append(", ")
+            arg.write(buf, ascii)
+        buf.append(")")
+
+    def compute_simplified(self):
+        # Collect the arguments along the chain of calls, so that e.g. (Lx.Ly.P)(a)(b)
+        # substitutes both arguments into P in a single pass and simplifies the result
+        # once, rather than once per argument.
+        args = []
+        head = self
+        while isinstance(head, Call):
+            args.append(head.arg)
+            head = head.caller
+        args.reverse()
+
+        caller = head.simplify()
+        new_args = [arg.simplify() for arg in args]
+        i = 0
+        while i < len(new_args) and isinstance(caller, Lambda):
+            substitutions = {}
+            while i < len(new_args) and isinstance(caller, Lambda):
+                substitutions[caller.parameter] = new_args[i]
+                caller = caller.body
+                i += 1
+            caller = caller.replace_variables(substitutions).simplify()
+
+        if caller is head and all(new is old for new, old in zip(new_args, args)):
+            return self
 
-    def simplify(self):
-        caller = self.caller.simplify()
-        arg = self.arg.simplify()
-        if isinstance(caller, Lambda):
-            return caller.body.replace_variable(caller.parameter, arg).simplify()
-        else:
-            return Call(self.caller, arg)
+        for arg in new_args[i:]:
+            caller = Call(caller, arg)
+        return caller
 
 
 class ForAll(Formula, namedtuple("ForAll", ["symbol", "body"])):
     prec = 5
+    subformula_fields = (1,)
+    binds_variable = True
 
-    def __str__(self):
-        return "∀ {0.symbol}.{0.body}".format(self)
+    def write(self, buf, ascii):
+        buf.append("A" if ascii else "∀ ")
+        buf.append(self.symbol)
+        buf.append(".")
+        self.body.write(buf, ascii)
 
-    def ascii_str(self):
-        return "A{0.symbol}.{0.body}".format(self)
-
-    def replace_variable(self, variable, replacement):
-        if variable != self.symbol:
-            return ForAll(
-                self.symbol, self.body.replace_variable(variable, replacement)
-            )
-        else:
-            return self
+    def compute_free_vars(self):
+        return self.body.free_vars - {self.symbol}
 
 
 class Exists(Formula, namedtuple("Exists", ["symbol", "body"])):
     prec = 5
+    subformula_fields = (1,)
+    binds_variable = True
 
-    def __str__(self):
-        return "∃ {0.symbol}.{0.body}".format(self)
-
-    def ascii_str(self):
-        return "E{0.symbol}.{0.body}".format(self)
+    def write(self, buf, ascii):
+        buf.append("E" if ascii else "∃ ")
+        buf.append(self.symbol)
+        buf.append(".")
+        self.body.write(buf, ascii)
 
-    def replace_variable(self, variable, replacement):
-        if variable != self.symbol:
-            return Exists(
-                self.symbol, self.body.replace_variable(variable, replacement)
-            )
-        else:
-            return self
+    def compute_free_vars(self):
+        return self.body.free_vars - {self.symbol}
 
 
 class Iota(Formula, namedtuple("Iota", ["symbol", "body"])):
     prec = 5
+    subformula_fields = (1,)
+    binds_variable = True
 
-    def __str__(self):
-        return "ι{0.symbol}.{0.body}".format(self)
-
-    def ascii_str(self):
+    def write(self, buf, ascii):
         # 'i' instead of 'ι'
-        return "i{0.symbol}.{0.body}".format(self)
+        buf.append("i" if ascii else "ι")
+        buf.append(self.symbol)
+        buf.append(".")
+        self.body.write(buf, ascii)
 
-    def replace_variable(self, variable, replacement):
-        if variable != self.symbol:
-            return Iota(self.symbol, self.body.replace_variable(variable, replacement))
+    def compute_free_vars(self):
+        return self.body.free_vars - {self.symbol}
+
+
+def cache_bottom_up(formula, attribute, method):
+    """Cache the result of calling `method`, the name of a method such as
+    "compute_free_vars", as `attribute` on `formula` and each of its descendants that
+    does not have it cached yet.
+
+    The descendants are visited bottom-up with an explicit stack, so that the method
+    always finds the results for the children already cached and never has to recurse.
+    This way, a deep tree is not limited by Python's recursion depth.
+    """
+    stack = [(formula, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if attribute in node.__dict__:
+            continue
+
+        if children_done:
+            setattr(node, attribute, getattr(node, method)())
         else:
-            return self
+            stack.append((node, True))
+            for i in node.subformula_fields:
+                stack.append((node[i], False))
+
+
+def replace_variables_iter(formula, substitutions):
+    """Simultaneously replace all unbound instances of each variable in `formula` by its
+    replacement in `substitutions`, a dictionary from variable names to formulas.
+
+    This is the implementation of Formula.replace_variable(s). It walks the tree with an
+    explicit stack instead of recursion, so it is not limited by Python's recursion
+    depth and does not pay for a Python function call per node.
+    """
+    # Each entry on the stack is a node, the substitutions in effect for it (binders
+    # mask the variable they bind), and a flag saying whether its children have already
+    # been processed. The rewritten nodes are accumulated on `results` in post-order,
+    # so the rewritten children of a node are always on top of `results` when the node
+    # itself is rebuilt.
+    stack = [(formula, substitutions, False)]
+    results = []
+    while stack:
+        node, subs, children_done = stack.pop()
+        if children_done:
+            fields = list(node)
+            changed = False
+            for i in reversed(node.subformula_fields):
+                child = results.pop()
+                changed = changed or child is not fields[i]
+                fields[i] = child
+            # Only allocate a new node if one of its children was actually rewritten.
+            results.append(node.__class__(*fields) if changed else node)
+        elif subs.keys().isdisjoint(node.free_vars):
+            results.append(node)
+        elif isinstance(node, Var):
+            results.append(subs[node.value])
+        else:
+            if node.binds_variable and node[0] in subs:
+                subs = {k: v for k, v in subs.items() if k != node[0]}
+            stack.append((node, subs, True))
+            for i in reversed(node.subformula_fields):
+                stack.append((node[i], subs, False))
+    return results.pop()
 
 
 # Below are defined the classes to represent semantic types as trees.
 
 
 class ComplexType(namedtuple("ComplexType", ["left", "right"])):
+    def __new__(cls, left, right):
+        # Complex types are interned for the same reason as variables. Since there are
+        # only a handful of distinct types in any lexicon, the cache stays small.
+        if cls is not ComplexType:
+            return super().__new__(cls, left, right)
+
+        # The classes are part of the key because e.g. AtomicType("e") == "e", and a
+        # type built from plain strings must not be handed out in place of one built
+        # from atomic types.
+        key = (left.__class__, left, right.__class__, right)
+        typ = _interned_types.get(key)
+        if typ is None:
+            typ = super().__new__(cls, left, right)
+            # Like variables, types past the cap are not interned.
+            if len(_interned_types) < MAX_INTERNED_TYPES:
+                _interned_types[key] = typ
+        return typ
+
     def __str__(self):
-        return "<{0.left}, {0.right}>".format(self)
+        # Types are immutable (and interned), so their string forms are computed once
+        # and cached on the object.
+        try:
+            return self._str
+        except AttributeError:
+            buf = []
+            self.write(buf, False)
+            self._str = "".join(buf)
+            return self._str
 
     def concise_str(self):
         """Convert the type to a string, recursively abbreviating '<x, y>' as 'xy' as
@@ -215,16 +434,72 @@ class ComplexType(namedtuple("ComplexType", ["left", "right"])):
            >>> typ.concise_str()
            'et'
         """
-        if isinstance(self.left, AtomicType) and isinstance(self.right, AtomicType):
-            return "{0.left}{0.right}".format(self)
+        try:
+            return self._concise_str
+        except AttributeError:
+            buf = []
+            self.write(buf, True)
+            self._concise_str = "".join(buf)
+            return self._concise_str
+
+    def write(self, buf, concise):
+        """Append the string representation of the type to `buf`, a list of strings,
+        using the abbreviated form if `concise` is true.
+        """
+        # Types like <e, <e, <e, t>>> nest to the right, so the right spine is walked
+        # in a loop and its closing brackets are written all at once at the end.
+        typ = self
+        depth = 0
+        while isinstance(typ, ComplexType):
+            if (
+                concise
+                and isinstance(typ.left, AtomicType)
+                and isinstance(typ.right, AtomicType)
+            ):
+                buf.append(typ.left)
+                buf.append(typ.right)
+                break
+
+            buf.append("<")
+            write_type(buf, typ.left, concise)
+            buf.append(", ")
+            depth += 1
+            typ = typ.right
         else:
-            return "<{}, {}>".format(self.left.concise_str(), self.right.concise_str())
+            write_type(buf, typ, concise)
+
+        if depth:
+            buf.append(">" * depth)
 
 
 class AtomicType(str):
+    def __new__(cls, value):
+        # Atomic types are interned like variables and complex types, so that e.g. the
+        # types returned by parse_type are the TYPE_* constants below.
+        if cls is not AtomicType:
+            return super().__new__(cls, value)
+
+        typ = _interned_atomic_types.get(value)
+        if typ is None:
+            typ = _interned_atomic_types[value] = super().__new__(cls, value)
+        return typ
+
     def concise_str(self):
         return self
 
+    def write(self, buf, concise):
+        buf.append(self)
+
+
+def write_type(buf, typ, concise):
+    """Append the string representation of `typ` to `buf`. Unlike the write methods,
+    this also accepts types whose leaves are plain strings rather than AtomicTypes.
+    """
+    if isinstance(typ, (ComplexType, AtomicType)):
+        typ.write(buf, concise)
+    else:
+        buf.append(str(typ))
+
 
 # Constants for the recognized atomic types.
 TYPE_ENTITY = AtomicType("e")
@@ -240,11 +515,30 @@ class SentenceNode(namedtuple("SentenceNode", ["text", "formula", "type"])):
         return f"SentenceNode({repr(self.text)}, {repr(str(self.formula))}, {repr(self.type.concise_str())})"
 
 
-def wrapb(parent, child):
-    """Return the child node as a string, wrapped in brackets if its precedence is
-    higher than the parent node.
+def write_binary(buf, node, operator, ascii):
+    """Write a binary operator node to `buf`, with `operator` between its operands.
+
+    Right-nested chains of the same operator, like a & b & c, are written in a loop
+    rather than by recursing once per operator.
+    """
+    cls = node.__class__
+    while True:
+        # write_wrapped applies brackets if needed for the proper precedence.
+        write_wrapped(buf, node, node.left, ascii)
+        buf.append(operator)
+        if node.right.__class__ is not cls:
+            break
+        node = node.right
+    write_wrapped(buf, node, node.right, ascii)
+
+
+def write_wrapped(buf, parent, child, ascii):
+    """Write the child node to `buf`, wrapped in brackets if its precedence is higher
+    than the parent node.
     """
     if child.prec > parent.prec:
-        return "[{}]".format(child)
+        buf.append("[")
+        child.write(buf, ascii)
+        buf.append("]")
     else:
-        return str(child)
+        child.write(buf, ascii)
@@ -16,55 +16,156 @@ def interpret_formula(formula, model):
     """Given a logical formula and a model of the world, return the formula's denotation
     in the model.
     """
+    # Quantifiers bind their variables in a private copy of the assignments, so that
+    # the model itself is never modified.
+    return compile_formula(formula)(model, dict(model.assignments))
+
+
+def compile_formula(formula):
+    """Compile `formula` into a function that takes a model of the world and a
+    dictionary of variable assignments, and returns the formula's denotation in the
+    model.
+
+    Dispatching on the type of each node is done once, when the formula is compiled,
+    rather than every time it is evaluated, which pays off when the same formula is
+    evaluated many times, e.g. the body of a quantifier. The compiled function is cached
+    on the formula, which is safe because formulas are immutable.
+    """
+    try:
+        return formula._compiled
+    except AttributeError:
+        formula._compiled = _compile(formula)
+        return formula._compiled
+
+
+def _compile(formula):
     if isinstance(formula, ast.Var):
-        return model.assignments[formula.value]
-    elif isinstance(formula, ast.And):
-        return interpret_formula(formula.left, model) and interpret_formula(
-            formula.right, model
-        )
-    elif isinstance(formula, ast.Or):
-        return interpret_formula(formula.left, model) or interpret_formula(
-            formula.right, model
-        )
+        name = formula.value
+        return lambda model, assignments: assignments[name]
+    elif isinstance(formula, (ast.And, ast.Or)):
+        # Right-nested chains like a & b & c are compiled into a single loop rather
+        # than one closure per conjunct, so that long chains do not exhaust the stack.
+        cls = formula.__class__
+        operands = []
+        while isinstance(formula, cls):
+            operands.append(compile_formula(formula.left))
+            formula = formula.right
+        operands.append(compile_formula(formula))
+
+        if cls is ast.And:
+
+            def f(model, assignments):
+                for operand in operands:
+                    value = operand(model, assignments)
+                    if not value:
+                        return value
+                return value
+
+        else:
+
+            def f(model, assignments):
+                for operand in operands:
+                    value = operand(model, assignments)
+                    if value:
+                        return value
+                return value
+
+        return f
     elif isinstance(formula, ast.IfThen):
-        return not interpret_formula(formula.left, model) or interpret_formula(
-            formula.right, model
+        left = compile_formula(formula.left)
+        right = compile_formula(formula.right)
+        return lambda model, assignments: not left(model, assignments) or right(
+            model, assignments
         )
     elif isinstance(formula, ast.Call):
-        caller = interpret_formula(formula.caller, model)
-        arg = interpret_formula(formula.arg, model)
-        return arg in caller
-    elif isinstance(formula, ast.ForAll):
-        return len(satisfiers(formula.body, model, formula.symbol)) == len(
-            model.individuals
+        caller = compile_formula(formula.caller)
+        arg = compile_formula(formula.arg)
+        return lambda model, assignments: arg(model, assignments) in caller(
+            model, assignments
         )
+    elif isinstance(formula, ast.ForAll):
+        body = formula.body
+        symbol = formula.symbol
+
+        def f(model, assignments):
+            sset = _satisfiers(body, model, assignments, symbol)
+            return len(sset) == len(model.individuals)
+
+        return f
     elif isinstance(formula, ast.Exists):
-        return len(satisfiers(formula.body, model, formula.symbol)) > 0
+        body = formula.body
+        symbol = formula.symbol
+
+        def f(model, assignments):
+            return len(_satisfiers(body, model, assignments, symbol)) > 0
+
+        return f
     elif isinstance(formula, ast.Not):
-        return not interpret_formula(formula.operand, model)
+        operand = compile_formula(formula.operand)
+        return lambda model, assignments: not operand(model, assignments)
     elif isinstance(formula, ast.Iota):
-        sset = satisfiers(formula.body, model, formula.symbol)
-        if len(sset) == 1:
-            return sset.pop()
-        else:
-            return None
+        body = formula.body
+        symbol = formula.symbol
+
+        def f(model, assignments):
+            sset = _satisfiers(body, model, assignments, symbol)
+            if len(sset) == 1:
+                return sset.pop()
+            else:
+                return None
+
+        return f
     else:
         # TODO: Handle LambdaNodes differently (they can't be interpreted, but they
         # should give a better error message).
-        raise NotImplementedError(formula.__class__)
+        # The error is only raised if the formula is actually evaluated, since it may
+        # be in a branch that is short-circuited, e.g. the right side of a false
+        # conjunction.
+        cls = formula.__class__
+
+        def f(model, assignments):
+            raise NotImplementedError(cls)
+
+        return f
 
 
 def satisfiers(formula, model, variable):
-    individuals = set()
-    old_value = model.assignments.get(variable)
-    for individual in model.individuals:
-        model.assignments[variable] = individual
-        if interpret_formula(formula, model):
-            individuals.add(individual)
-
-    if old_value is None:
-        del model.assignments[variable]
-    else:
-        model.assignments[variable] = old_value
+    """Return the set of individuals in the model for which `formula` is true when
+    they are assigned to `variable`. The model is not modified.
+    """
+    return _satisfiers(formula, model, dict(model.assignments), variable)
+
+
+def _satisfiers(formula, model, assignments, variable):
+    if not model.individuals:
+        return set()
+
+    if variable not in formula.free_vars:
+        # The formula's value does not depend on the variable, so evaluate it once
+        # instead of once per individual.
+        if compile_formula(formula)(model, assignments):
+            return set(model.individuals)
+        else:
+            return set()
+
+    f = compile_formula(formula)
+    old_value = assignments.get(variable, _UNASSIGNED)
+    try:
+        return {
+            individual
+            for individual in model.individuals
+            if f(model, _bind(assignments, variable, individual))
+        }
+    finally:
+        if old_value is _UNASSIGNED:
+            del assignments[variable]
+        else:
+            assignments[variable] = old_value
+
+
+def _bind(assignments, variable, value):
+    assignments[variable] = value
+    return assignments
+
 
-    return individuals
+_UNASSIGNED = object()
@@ -4,6 +4,9 @@ expressions.
 Author:  Ian Fisher (iafisher@protonmail.com)
 Version: September 2018
 """
+import sys
+from functools import lru_cache
+
 from lark import Lark, Transformer
 from lark.exceptions import LarkError
 
@@ -29,16 +32,16 @@ class TreeToFormula(Transformer):
         return ast.And(matches[0], matches[2])
 
     def variable(self, matches):
-        return ast.Var(matches[0])
+        return ast.Var(symbol(matches[0]))
 
     def lambda_(self, matches):
-        return ast.Lambda(matches[1], matches[2])
+        return ast.Lambda(symbol(matches[1]), matches[2])
 
     def forall(self, matches):
-        return ast.ForAll(matches[1], matches[2])
+        return ast.ForAll(symbol(matches[1]), matches[2])
 
     def exists(self, matches):
-        return ast.Exists(matches[1], matches[2])
+        return ast.Exists(symbol(matches[1]), matches[2])
 
     def call(self, matches):
         # The parse tree allows n-ary functions but the AST only allows unary functions.
@@ -50,12 +53,22 @@ class TreeToFormula(Transformer):
         return func
 
     def iota(self, matches):
-        return ast.Iota(matches[1], matches[2])
+        return ast.Iota(symbol(matches[1]), matches[2])
 
     def not_e(self, matches):
         return ast.Not(matches[1])
 
 
+def symbol(token):
+    """Convert a SYMBOL token into the string stored in the AST.
+
+    Lark's tokens are str subclasses that carry their position in the input, so they
+    are converted to plain strings, which are then interned so that every occurrence of
+    a name shares one string object.
+    """
+    return sys.intern(str(token))
+
+
 # The grammar of the logical language.
 formula_parser = Lark(
     """
@@ -100,62 +113,109 @@ formula_parser = Lark(
     %ignore WS
 """,
     parser="lalr",
+    # SYMBOL cannot begin with any of the binder keywords, so the terminals never
+    # overlap and the plain lexer suffices; the contextual lexer would only add
+    # overhead.
+    lexer="standard",
     transformer=TreeToFormula(),
 )
 
 
+# Formula and type trees are immutable, so the parse functions can safely hand out the
+# same tree to every caller that parses the same string, e.g. the many lexicon entries
+# that share a type.
+@lru_cache(maxsize=4096)
 def parse_formula(formula):
     """Parse `formula`, a string, into a tree of Formula objects.
 
     If the string cannot be parsed, a montague.exceptions.ParseError is raised.
     """
+    # Reject blank input up front rather than running the lexer and parser over it.
+    if not formula or formula.isspace():
+        raise ParseError("empty formula")
+
     try:
         return formula_parser.parse(formula)
     except LarkError as e:
         raise ParseError(str(e)) from None
 
 
-class TreeToType(Transformer):
-    """Transform Lark's parse tree into a type tree with ComplexType and AtomicType
-    objects.
-    """
+@lru_cache(maxsize=4096)
+def parse_type(typestring):
+    """Parse `typestring` into a tree of ComplexType and AtomicType objects.
 
-    def type(self, matches):
-        if len(matches) == 2:
-            return ast.ComplexType(matches[0], matches[1])
-        elif len(matches) == 1:
-            if len(matches[0]) == 2:
-                return ast.ComplexType(
-                    ast.AtomicType(matches[0][0]), ast.AtomicType(matches[0][1])
+    If the string cannot be parsed, a montague.exceptions.ParseError is raised.
+    """
+    # The type language is small enough that it is parsed by hand rather than by Lark:
+    # a single left-to-right scan that keeps a stack of the complex types still awaiting
+    # their right-hand side. A None on the stack marks a complex type whose left-hand
+    # side has not been parsed yet.
+    stack = []
+    i = 0
+    n = len(typestring)
+    while True:
+        i = skip_whitespace(typestring, i)
+        if i == n:
+            raise ParseError("unexpected end of type")
+
+        c = typestring[i]
+        if c == "<":
+            stack.append(None)
+            i += 1
+            continue
+        elif c in ATOMIC_TYPE_LETTERS:
+            # Two letters in a row, e.g. "et", abbreviate the complex type <e, t>.
+            if i + 1 < n and typestring[i + 1] in ATOMIC_TYPE_LETTERS:
+                typ = ast.ComplexType(
+                    ast.AtomicType(c), ast.AtomicType(typestring[i + 1])
                 )
+                i += 2
             else:
-                return ast.AtomicType(matches[0])
+                typ = ast.AtomicType(c)
+                i += 1
         else:
-            raise NotImplementedError
+            raise ParseError("unexpected character {!r} at position {}".format(c, i))
 
+        # `typ` completes the right-hand side of every complex type on top of the stack
+        # whose left-hand side is already known.
+        while stack and stack[-1] is not None:
+            i = expect(typestring, i, ">")
+            typ = ast.ComplexType(stack.pop(), typ)
 
-# The grammar of the type mini-language.
-type_parser = Lark(
-    """
-    ?start: type
+        if stack:
+            i = expect(typestring, i, ",")
+            stack[-1] = typ
+        else:
+            break
 
-    type: "<" type "," type ">"
-        | /[evst]{1,2}/
+    i = skip_whitespace(typestring, i)
+    if i != n:
+        raise ParseError(
+            "unexpected character {!r} at position {}".format(typestring[i], i)
+        )
+    return typ
 
-    %import common.WS
-    %ignore WS
-""",
-    parser="lalr",
-    transformer=TreeToType(),
-)
 
+ATOMIC_TYPE_LETTERS = "evst"
+# The whitespace characters that the formula grammar ignores (common.WS in Lark).
+WHITESPACE = " \t\n\r\f"
 
-def parse_type(typestring):
-    """Parse `typestring` into a tree of ComplexType and AtomicType objects.
 
-    If the string cannot be parsed, a montague.exceptions.ParseError is raised.
+def skip_whitespace(s, i):
+    n = len(s)
+    while i < n and s[i] in WHITESPACE:
+        i += 1
+    return i
+
+
+def expect(s, i, c):
+    """Return the position after the character `c` in `s`, which must be the next
+    non-whitespace character after position `i`.
     """
-    try:
-        return type_parser.parse(typestring)
-    except LarkError as e:
-        raise ParseError(str(e)) from None
+    i = skip_whitespace(s, i)
+    if i < len(s) and s[i] == c:
+        return i + 1
+    elif i < len(s):
+        raise ParseError("expected {!r} at position {}, got {!r}".format(c, i, s[i]))
+    else:
+        raise ParseError("expected {!r} at end of type".format(c))
@@ -8,7 +8,7 @@ import itertools
 from collections import OrderedDict
 
 from . import ast
-from .exceptions import CombinationError, LexiconError, ParseError
+from .exceptions import LexiconError, ParseError
 from .parser import parse_formula, parse_type
 
 
@@ -17,7 +17,12 @@ def translate_sentence(sentence, lexicon):
     Translate `sentence`, a string containing English text, into a logical formula
     which represents its truth conditions.
     """
-    terms = [lexicon.get(word, default_for_unknown(word)) for word in sentence.split()]
+    # The default readings are only built for words that are actually missing, rather
+    # than being passed as the default of lexicon.get for every word.
+    terms = [
+        lexicon[word] if word in lexicon else default_for_unknown(word)
+        for word in sentence.split()
+    ]
     all_possibilities = list(list(t) for t in itertools.product(*terms))
     in_progress = []
     finished = []
@@ -27,15 +32,20 @@ def translate_sentence(sentence, lexicon):
         else:
             in_progress.append(p)
 
+    # Different orders of combination often arrive at the same sequence of terms, e.g.
+    # [AB, CD] from combining A and B before or after C and D. Memoizing `combine` on
+    # the identity of its arguments makes such sequences consist of the very same
+    # objects, so that duplicates can be dropped before they are explored again.
+    memo = {}
     while in_progress:
-        new_in_progress = []
+        new_in_progress = OrderedDict()
         for terms in in_progress:
-            for new_terms in step(terms):
+            for new_terms in step(terms, memo):
                 if len(new_terms) == 1:
                     finished.append(new_terms[0])
                 else:
-                    new_in_progress.append(new_terms)
-        in_progress = new_in_progress
+                    new_in_progress.setdefault(tuple(map(id, new_terms)), new_terms)
+        in_progress = list(new_in_progress.values())
 
     for i in range(len(finished)):
         finished[i] = finished[i]._replace(formula=finished[i].formula.simplify())
@@ -44,14 +54,30 @@ def translate_sentence(sentence, lexicon):
     return list(OrderedDict.fromkeys(finished).keys())
 
 
-def step(terms):
+def step(terms, memo=None):
+    """Return every sequence of terms that results from combining one adjacent pair of
+    `terms`.
+
+    If `memo` is given, it is a dictionary used to reuse the results of earlier calls to
+    `combine` on the same pair of term objects.
+    """
     stepped_terms = []
     for i in range(len(terms) - 1):
-        try:
-            combined = combine(terms[i], terms[i + 1])
-        except CombinationError:
-            pass
+        term1 = terms[i]
+        term2 = terms[i + 1]
+        if memo is None:
+            combined = combine(term1, term2)
         else:
+            key = (id(term1), id(term2))
+            try:
+                combined = memo[key][2]
+            except KeyError:
+                combined = combine(term1, term2)
+                # The terms are kept in the entry so that their ids cannot be reused
+                # while the memo is alive.
+                memo[key] = (term1, term2, combined)
+
+        if combined is not None:
             stepped_terms.append(terms[:i] + [combined] + terms[i + 2 :])
     return stepped_terms
 
@@ -59,44 +85,51 @@ def step(terms):
 def combine(term1, term2):
     """Attempt to combine the two terms by function application. If the terms' types are
     compatible, then a single term representing the denotation of the two terms combined
-    is returned. If the types are not compatible, a CombinationError is raised.
+    is returned. If the types are not compatible, None is returned.
+
+    Failure to combine is the common case when sweeping over a sentence, so it is
+    signalled with a return value rather than an exception.
+
+    The type checks of `can_combine` are inlined here, in both directions, so that each
+    pair of terms is only inspected once.
     """
-    if can_combine(term1, term2):
-        if term1.type == term2.type:
-            # Modification
-            return ast.SentenceNode(
-                term1.text + " " + term2.text,
-                # TODO [2019-05-20]: Is it safe to introduce a new symbol like this?
-                ast.Lambda(
-                    "x",
-                    ast.And(
-                        ast.Call(term1.formula, ast.Var("x")),
-                        ast.Call(term2.formula, ast.Var("x")),
-                    ),
+    type1 = term1.type
+    type2 = term2.type
+    if type1 == TYPE_ET and type2 == TYPE_ET:
+        # Modification
+        return ast.SentenceNode(
+            term1.text + " " + term2.text,
+            # TODO [2019-05-20]: Is it safe to introduce a new symbol like this?
+            ast.Lambda(
+                "x",
+                ast.And(
+                    ast.Call(term1.formula, ast.Var("x")),
+                    ast.Call(term2.formula, ast.Var("x")),
                 ),
-                term1.type,
-            )
-        else:
-            # Predication
-            return ast.SentenceNode(
-                term1.text + " " + term2.text,
-                ast.Call(term1.formula, term2.formula),
-                term1.type.right,
-            )
-    elif can_combine(term2, term1):
-        # Don't need to handle the modification case here, because if it applied it
-        # would have triggered the first if clause.
+            ),
+            type1,
+        )
+    elif isinstance(type1, ast.ComplexType) and type1.left == type2:
+        # Predication
+        return ast.SentenceNode(
+            term1.text + " " + term2.text,
+            ast.Call(term1.formula, term2.formula),
+            type1.right,
+        )
+    elif isinstance(type2, ast.ComplexType) and type2.left == type1:
+        # Predication, with the function on the right. `text` should still maintain
+        # linear order.
         return ast.SentenceNode(
-            # `text` should maintain linear order.
             term1.text + " " + term2.text,
             ast.Call(term2.formula, term1.formula),
-            term2.type.right,
+            type2.right,
         )
     else:
-        raise CombinationError
+        return None
 
 
 TYPE_ET = ast.ComplexType(ast.TYPE_ENTITY, ast.TYPE_TRUTH_VALUE)
+TYPE_EET = ast.ComplexType(ast.TYPE_ENTITY, TYPE_ET)
 
 
 def can_combine(term1, term2):
@@ -131,7 +164,9 @@ def load_lexical_entry(key, values):
         except ParseError as e:
             raise LexiconError("could not parse type of {} ({})".format(key, e))
 
-        trees.append(ast.SentenceNode(key, denotation, type_))
+        # Denotations are put in normal form once, at load time, so that the same
+        # reductions are not repeated in every translation that uses the entry.
+        trees.append(ast.SentenceNode(key, denotation.simplify(), type_))
 
     return trees
 
@@ -140,9 +175,7 @@ def default_for_unknown(word):
     """Provide a default definition for words that are not in the lexicon."""
     proper_noun = ast.SentenceNode(word, ast.Var(word.lower()), ast.TYPE_ENTITY)
     single_place = ast.SentenceNode(
-        word,
-        ast.Lambda("x", ast.Call(ast.Var(word.title()), ast.Var("x"))),
-        ast.ComplexType(ast.TYPE_ENTITY, ast.TYPE_TRUTH_VALUE),
+        word, ast.Lambda("x", ast.Call(ast.Var(word.title()), ast.Var("x"))), TYPE_ET
     )
     double_place = ast.SentenceNode(
         word,
@@ -153,8 +186,6 @@ def default_for_unknown(word):
                 ast.Call(ast.Call(ast.Var(word.title()), ast.Var("x")), ast.Var("y")),
             ),
         ),
-        ast.ComplexType(
-            ast.TYPE_ENTITY, ast.ComplexType(ast.TYPE_ENTITY, ast.TYPE_TRUTH_VALUE)
-        ),
+        TYPE_EET,
     )
     return [proper_noun, single_place, double_place]
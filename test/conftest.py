@@ -3,6 +3,7 @@ import os
 
 import pytest
 
+from montague.interpreter import WorldModel
 from montague.translator import load_lexicon
 
 
@@ -12,3 +13,25 @@ def lexicon():
     fragment_path = os.path.join(project_dir, "montague", "resources", "fragment.json")
     with open(fragment_path) as f:
         return load_lexicon(json.load(f))
+
+
+@pytest.fixture(scope="session")
+def test_model():
+    john = object()
+    mary = object()
+    # The model is shared by the whole session, so its sets are frozen to keep one test
+    # from changing the model under another.
+    return WorldModel(
+        frozenset({john, mary}),
+        {
+            "j": john,
+            "john": john,
+            "m": mary,
+            "mary": mary,
+            "Good": frozenset({john}),
+            "Bad": frozenset({mary}),
+            "Man": frozenset({john}),
+            "Human": frozenset({mary, john}),
+            "Alien": frozenset(),
+        },
+    )
@@ -1,5 +1,9 @@
+import sys
+
+from montague import ast
 from montague.ast import (
     And,
+    AtomicType,
     Call,
     ComplexType,
     Exists,
@@ -139,6 +143,14 @@ def test_deeply_recursive_type_to_concise_str():
     assert typ.concise_str() == "<v, <et, et>>"
 
 
+def test_long_right_nested_type_to_str():
+    typ = TYPE_TRUTH_VALUE
+    for _ in range(5000):
+        typ = ComplexType(TYPE_ENTITY, typ)
+    assert str(typ) == "<e, " * 5000 + "t" + ">" * 5000
+    assert typ.concise_str() == "<e, " * 4999 + "et" + ">" * 4999
+
+
 def test_simple_replace_variable():
     assert Var("x").replace_variable("x", Var("y")) == Var("y")
 
@@ -184,3 +196,134 @@ def test_replace_variable_in_iota():
     tree = Iota("x", And(Var("x"), Var("y")))
     assert tree.replace_variable("x", Var("a")) == tree
     assert tree.replace_variable("y", Var("b")) == Iota("x", And(Var("x"), Var("b")))
+
+
+def test_free_vars():
+    assert Var("x").free_vars == {"x"}
+    assert And(Var("x"), Call(Var("P"), Var("y"))).free_vars == {"x", "y", "P"}
+    assert Lambda("x", And(Var("x"), Var("y"))).free_vars == {"y"}
+    tree = ForAll("x", Exists("y", Call(Call(Var("R"), Var("x")), Var("y"))))
+    assert tree.free_vars == {"R"}
+    assert Iota("x", Var("x")).free_vars == frozenset()
+
+
+def test_replace_variable_that_is_not_free_returns_same_tree():
+    tree = And(Lambda("x", Var("x")), Var("y"))
+    assert tree.replace_variable("x", Var("a")) is tree
+    assert tree.replace_variable("z", Var("a")) is tree
+
+
+def test_replace_variable_in_long_conjunction():
+    tree = Var("a")
+    for _ in range(5000):
+        tree = And(tree, Var("x"))
+
+    new_tree = tree.replace_variable("x", Var("y"))
+    for _ in range(5000):
+        assert new_tree.right is Var("y")
+        new_tree = new_tree.left
+    assert new_tree is Var("a")
+
+
+def test_replace_variable_in_deeply_nested_call():
+    tree = Var("F")
+    for _ in range(5000):
+        tree = Call(tree, Var("x"))
+
+    new_tree = tree.replace_variable("x", Var("y"))
+    for _ in range(5000):
+        assert new_tree.arg is Var("y")
+        new_tree = new_tree.caller
+    assert new_tree is Var("F")
+
+
+class MyVar(Var):
+    pass
+
+
+class MyAnd(And):
+    pass
+
+
+def test_replace_variable_in_formula_subclasses():
+    tree = MyAnd(MyVar("x"), Lambda("y", MyVar("x")))
+    assert tree.replace_variable("x", Var("z")) == And(Var("z"), Lambda("y", Var("z")))
+    assert tree.simplify() is tree
+
+
+def test_variables_and_complex_types_are_interned():
+    assert Var("x") is Var("x")
+    assert Var("x") is not Var("y")
+    assert ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE) is ComplexType(
+        TYPE_ENTITY, TYPE_TRUTH_VALUE
+    )
+
+
+def test_variable_names_are_interned():
+    name = "".join(["hand", "built"])
+    assert Var(name).value is sys.intern("handbuilt")
+    assert MyVar(name).value is sys.intern("handbuilt")
+
+
+def test_interned_variables_are_capped(monkeypatch):
+    monkeypatch.setattr(ast, "MAX_INTERNED_VARS", len(ast._interned_vars))
+    assert Var("not_yet_interned") is not Var("not_yet_interned")
+    assert Var("not_yet_interned") == Var("not_yet_interned")
+    assert "not_yet_interned" not in ast._interned_vars
+
+
+def test_interned_complex_types_are_capped(monkeypatch):
+    monkeypatch.setattr(ast, "MAX_INTERNED_TYPES", len(ast._interned_types))
+    typ = ComplexType(TYPE_WORLD, ComplexType(TYPE_WORLD, TYPE_EVENT))
+    assert typ is not ComplexType(TYPE_WORLD, ComplexType(TYPE_WORLD, TYPE_EVENT))
+    assert typ == ComplexType(TYPE_WORLD, ComplexType(TYPE_WORLD, TYPE_EVENT))
+
+
+def test_complex_type_of_plain_strings_is_not_interned_as_atomic_type():
+    plain = ComplexType("e", "t")
+    typ = ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE)
+    assert typ is not plain
+    assert isinstance(typ.left, AtomicType)
+    assert str(plain) == "<e, t>"
+    assert str(typ) == "<e, t>"
+
+
+def test_nested_formula_to_ascii_str():
+    tree = Lambda("x", ForAll("y", Exists("z", Iota("w", Call(Var("P"), Var("x"))))))
+    assert tree.ascii_str() == "Lx.Ay.Ez.iw.P(x)"
+
+
+def test_formula_strings_are_cached():
+    tree = Lambda("x", And(Call(Var("P"), Var("x")), Var("y")))
+    assert str(tree) is str(tree)
+    assert tree.ascii_str() is tree.ascii_str()
+    assert str(tree) == "λx.P(x) & y"
+    assert tree.ascii_str() == "Lx.P(x) & y"
+
+
+def test_replace_variable_shares_unchanged_subtrees():
+    untouched = Call(Var("P"), Var("y"))
+    tree = And(untouched, Var("x"))
+    new_tree = tree.replace_variable("x", Var("z"))
+    assert new_tree == And(Call(Var("P"), Var("y")), Var("z"))
+    assert new_tree.left is untouched
+    # Replacing a variable with itself leaves the whole tree untouched.
+    assert tree.replace_variable("x", Var("x")) is tree
+
+
+def test_replace_variables():
+    tree = And(Call(Var("P"), Var("x")), Lambda("x", Call(Var("Q"), Var("x"))))
+    assert tree.replace_variables({"x": Var("y"), "Q": Var("Good")}) == And(
+        Call(Var("P"), Var("y")), Lambda("x", Call(Var("Good"), Var("x")))
+    )
+    # The replacements are simultaneous.
+    assert Or(Var("x"), Var("y")).replace_variables(
+        {"x": Var("y"), "y": Var("x")}
+    ) == Or(Var("y"), Var("x"))
+
+
+def test_long_chain_to_str():
+    tree = Var("x0")
+    for i in range(1, 5000):
+        tree = And(Var("x{}".format(i)), tree)
+    assert str(tree) == " & ".join("x{}".format(i) for i in reversed(range(5000)))
@@ -1,103 +1,131 @@
-from montague.ast import And, Call, Exists, ForAll, Iota, Not, Var
-from montague.interpreter import WorldModel, interpret_formula, satisfiers
-
-
-John = object()
-Mary = object()
-
-
-test_model = WorldModel(
-    set([John, Mary]),
-    {
-        "j": John,
-        "m": Mary,
-        "Good": {John},
-        "Bad": {Mary},
-        "Man": {John},
-        "Human": {Mary, John},
-        "Alien": set(),
-    },
+import pytest
+
+from montague.ast import And, Call, Exists, ForAll, Iota, Lambda, Not, Var
+from montague.interpreter import (
+    WorldModel,
+    compile_formula,
+    interpret_formula,
+    satisfiers,
 )
 
 
-def test_john_is_good_is_true():
-    formula = Call(Var("Good"), Var("j"))
+# Formulas shared between tests, built once at import time.
+JOHN_IS_GOOD = Call(Var("Good"), Var("j"))
+JOHN_IS_BAD = Call(Var("Bad"), Var("j"))
+MARY_IS_BAD = Call(Var("Bad"), Var("m"))
+X_IS_GOOD = Call(Var("Good"), Var("x"))
+X_IS_BAD = Call(Var("Bad"), Var("x"))
+X_IS_HUMAN = Call(Var("Human"), Var("x"))
+X_IS_ALIEN = Call(Var("Alien"), Var("x"))
+X_IS_MAN = Call(Var("Man"), Var("x"))
+THE_MAN = Iota("x", X_IS_MAN)
+
+
+# Pairs of formulas and their expected truth values in the test model.
+TRUTH_VALUE_CASES = [
+    # John is good.
+    (JOHN_IS_GOOD, True),
+    (Not(JOHN_IS_GOOD), False),
+    # John is bad.
+    (JOHN_IS_BAD, False),
+    (Not(JOHN_IS_BAD), True),
+    # Mary is bad and John is good.
+    (And(MARY_IS_BAD, JOHN_IS_GOOD), True),
+    # Everyone is bad.
+    (ForAll("x", X_IS_BAD), False),
+    # Everyone is human.
+    (ForAll("x", X_IS_HUMAN), True),
+    # Someone is bad.
+    (Exists("x", X_IS_BAD), True),
+    # Someone is an alien.
+    (Exists("x", X_IS_ALIEN), False),
+    # The man is good.
+    (Call(Var("Good"), THE_MAN), True),
+]
+
+
+@pytest.mark.parametrize("formula,expected", TRUTH_VALUE_CASES)
+def test_truth_value(formula, expected, test_model):
+    assert bool(interpret_formula(formula, test_model)) is expected
+
+
+def test_long_conjunction_is_true(test_model):
+    formula = JOHN_IS_GOOD
+    human = Call(Var("Human"), Var("m"))
+    for _ in range(5000):
+        formula = And(human, formula)
     assert interpret_formula(formula, test_model)
-    assert not interpret_formula(Not(formula), test_model)
 
 
-def test_john_is_bad_is_false():
-    formula = Call(Var("Bad"), Var("j"))
-    assert not interpret_formula(formula, test_model)
-    assert interpret_formula(Not(formula), test_model)
+def test_compiled_formula_is_cached(test_model):
+    formula = ForAll("x", X_IS_HUMAN)
+    f = compile_formula(formula)
+    assert compile_formula(formula) is f
+    assert f(test_model, test_model.assignments) is True
 
 
-def test_mary_is_bad_and_john_is_good_is_true():
-    formula = And(Call(Var("Bad"), Var("m")), Call(Var("Good"), Var("j")))
-    assert interpret_formula(formula, test_model)
+def test_cannot_interpret_lambda(test_model):
+    with pytest.raises(NotImplementedError):
+        interpret_formula(Lambda("x", X_IS_GOOD), test_model)
 
 
-def test_everyone_is_bad_is_false():
-    formula = ForAll("x", Call(Var("Bad"), Var("x")))
-    assert not interpret_formula(formula, test_model)
+def test_lambda_in_short_circuited_branch_is_not_interpreted(test_model):
+    formula = And(JOHN_IS_BAD, Lambda("x", X_IS_GOOD))
+    assert interpret_formula(formula, test_model) is False
 
 
-def test_everyone_is_human_is_true():
-    formula = ForAll("x", Call(Var("Human"), Var("x")))
-    assert interpret_formula(formula, test_model)
-
-
-def test_someone_is_bad_is_true():
-    formula = Exists("x", Call(Var("Bad"), Var("x")))
-    assert interpret_formula(formula, test_model)
+def test_the_man_is_john(test_model):
+    assert interpret_formula(THE_MAN, test_model) == test_model.assignments["j"]
 
 
-def test_someone_is_alien_is_false():
-    formula = Exists("x", Call(Var("Alien"), Var("x")))
-    assert not interpret_formula(formula, test_model)
+def test_the_human_is_undefined(test_model):
+    formula = Iota("x", X_IS_HUMAN)
+    assert interpret_formula(formula, test_model) is None
 
 
-def test_the_man_is_john():
-    formula = Iota("x", Call(Var("Man"), Var("x")))
-    assert interpret_formula(formula, test_model) == John
+def test_satisfiers_good_set(test_model):
+    sset = satisfiers(X_IS_GOOD, test_model, "x")
+    assert sset == {test_model.assignments["j"]}
 
 
-def test_the_man_is_good_is_true():
-    formula = Call(Var("Good"), Iota("x", Call(Var("Man"), Var("x"))))
-    assert interpret_formula(formula, test_model)
+def test_satisfiers_bad_set(test_model):
+    sset = satisfiers(X_IS_BAD, test_model, "x")
+    assert sset == {test_model.assignments["m"]}
 
 
-def test_the_human_is_undefined():
-    formula = Iota("x", Call(Var("Human"), Var("x")))
-    assert interpret_formula(formula, test_model) is None
+def test_satisfiers_human_set(test_model):
+    sset = satisfiers(X_IS_HUMAN, test_model, "x")
+    assert sset == test_model.individuals
 
 
-def test_satisfiers_good_set():
-    sset = satisfiers(Call(Var("Good"), Var("x")), test_model, "x")
-    assert sset == {John}
+def test_satisfiers_alien_set(test_model):
+    sset = satisfiers(X_IS_ALIEN, test_model, "x")
+    assert sset == set()
 
 
-def test_satisfiers_bad_set():
-    sset = satisfiers(Call(Var("Bad"), Var("x")), test_model, "x")
-    assert sset == {Mary}
+def test_satisfiers_of_formula_without_variable(test_model):
+    assert satisfiers(JOHN_IS_GOOD, test_model, "x") == test_model.individuals
+    assert satisfiers(JOHN_IS_BAD, test_model, "x") == set()
 
 
-def test_satisfiers_human_set():
-    sset = satisfiers(Call(Var("Human"), Var("x")), test_model, "x")
-    assert sset == {John, Mary}
+def test_satisfiers_does_not_overwrite_assignment():
+    john = object()
+    model = WorldModel({object()}, {"j": john})
+    satisfiers(Var("j"), model, "j")
+    assert model.assignments["j"] == john
 
 
-def test_satisfiers_alien_set():
-    sset = satisfiers(Call(Var("Alien"), Var("x")), test_model, "x")
-    assert sset == set()
+def test_satisfiers_in_empty_model():
+    model = WorldModel(set(), {"Good": set()})
+    assert satisfiers(Call(Var("Good"), Var("x")), model, "x") == set()
 
 
-def test_satisfiers_does_not_overwrite_assignment():
-    model = WorldModel({Mary}, {"j": John})
-    satisfiers(Var("j"), model, "j")
-    assert model.assignments["j"] == John
+def test_satisfiers_in_empty_model_does_not_evaluate_formula():
+    # Evaluating the formula would raise, since "j" has no assignment.
+    model = WorldModel(set(), {"Good": set()})
+    assert satisfiers(Call(Var("Good"), Var("j")), model, "x") == set()
 
 
-def test_satisfiers_does_not_create_assignment():
+def test_satisfiers_does_not_create_assignment(test_model):
     satisfiers(Var("j"), test_model, "some_nonexistent_variable")
     assert "some_nonexistent_variable" not in test_model.assignments
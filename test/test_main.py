@@ -1,6 +1,8 @@
-import pytest
+from types import MappingProxyType
 from unittest.mock import patch
 
+import pytest
+
 from montague.ast import (
     Call,
     ComplexType,
@@ -13,18 +15,21 @@ from montague.ast import (
 from montague.main import ShellState, execute_command, HELP_MESSAGE
 
 
-TEST_LEXICON = {
-    "good": SentenceNode(
-        "good",
-        Lambda("x", Call(Var("Good"), Var("x"))),
-        ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE),
-    ),
-    "bad": SentenceNode(
-        "bad",
-        Lambda("x", Call(Var("Bad"), Var("x"))),
-        ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE),
-    ),
-}
+# Every shell_state shares this lexicon, so it is exposed read-only.
+TEST_LEXICON = MappingProxyType(
+    {
+        "good": SentenceNode(
+            "good",
+            Lambda("x", Call(Var("Good"), Var("x"))),
+            ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE),
+        ),
+        "bad": SentenceNode(
+            "bad",
+            Lambda("x", Call(Var("Bad"), Var("x"))),
+            ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE),
+        ),
+    }
+)
 
 
 @pytest.fixture
@@ -109,76 +109,74 @@ def test_parsing_iota():
     assert parse_formula("ιx.Man(x)") == Iota("x", Call(Var("Man"), Var("x")))
 
 
-def test_parsing__missing_operand():
-    with pytest.raises(ParseError):
-        parse_formula("a | ")
-    with pytest.raises(ParseError):
-        parse_formula("b & ")
-    with pytest.raises(ParseError):
-        parse_formula("| a")
-    with pytest.raises(ParseError):
-        parse_formula("& b")
-
-
-def test_parsing_hanging_bracket():
-    with pytest.raises(ParseError):
-        parse_formula("[x | y")
-
-
-def test_parsing_lambda_missing_body():
-    with pytest.raises(ParseError):
-        parse_formula("Lx.")
-
-
-def test_parsing_for_all_missing_body():
-    with pytest.raises(ParseError):
-        parse_formula("Ax.")
-
-
-def test_parsing_exists_missing_body():
-    with pytest.raises(ParseError):
-        parse_formula("Ex.")
-
-
-def test_parsing_iota_missing_body():
-    with pytest.raises(ParseError):
-        parse_formula("ix.")
-
-
-def test_parsing_call_with_no_arg():
-    with pytest.raises(ParseError):
-        parse_formula("Happy()")
-
-
-def test_parsing_unknown_token():
-    with pytest.raises(ParseError):
-        parse_formula("Lx.x?")
-
-
-def test_parsing_empty_string():
-    with pytest.raises(ParseError):
-        parse_formula("")
-
-
-def test_parsing_blank_string():
-    with pytest.raises(ParseError):
-        parse_formula("     \t    \n \r \f")
-
-
-def test_parsing_atomic_types():
-    assert parse_type("e") == TYPE_ENTITY
-    assert parse_type("t") == TYPE_TRUTH_VALUE
-    assert parse_type("v") == TYPE_EVENT
-    assert parse_type("s") == TYPE_WORLD
-
-
-def test_parsing_compound_type():
-    assert parse_type("<e, t>") == ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE)
-
-
-def test_parsing_abbreviated_compound_types():
-    assert parse_type("et") == ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE)
-    assert parse_type("vt") == ComplexType(TYPE_EVENT, TYPE_TRUTH_VALUE)
+def test_parsed_names_are_plain_interned_strings():
+    tree = parse_formula("Lx.Ay.Between(x, y)")
+    assert type(tree.parameter) is str
+    assert type(tree.body.symbol) is str
+    assert type(tree.body.body.caller.caller.value) is str
+    assert tree.parameter is tree.body.body.caller.arg.value
+
+
+# Formulas that are not well-formed, one per kind of syntax error.
+FORMULA_PARSE_ERROR_CASES = [
+    # Missing operand
+    "a | ",
+    "b & ",
+    "| a",
+    "& b",
+    # Hanging bracket
+    "[x | y",
+    # Binders with no body
+    "Lx.",
+    "Ax.",
+    "Ex.",
+    "ix.",
+    # Call with no argument
+    "Happy()",
+    # Unknown token
+    "Lx.x?",
+    # Empty and blank strings
+    "",
+    "     \t    \n \r \f",
+]
+
+
+@pytest.mark.parametrize("formula", FORMULA_PARSE_ERROR_CASES)
+def test_parsing_invalid_formula(formula):
+    with pytest.raises(ParseError):
+        parse_formula(formula)
+
+
+ET = ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE)
+E_ST = ComplexType(TYPE_ENTITY, ComplexType(TYPE_WORLD, TYPE_TRUTH_VALUE))
+
+
+# Pairs of well-formed type strings and the types they denote.
+TYPE_PARSE_CASES = [
+    # Atomic types
+    ("e", TYPE_ENTITY),
+    ("t", TYPE_TRUTH_VALUE),
+    ("v", TYPE_EVENT),
+    ("s", TYPE_WORLD),
+    # Compound types
+    ("<e, t>", ET),
+    ("et", ET),
+    ("vt", ComplexType(TYPE_EVENT, TYPE_TRUTH_VALUE)),
+    ("<<e, t>, <e, <s, t>>>", ComplexType(ET, E_ST)),
+    ("<et, <e, st>>", ComplexType(ET, E_ST)),
+]
+
+
+@pytest.mark.parametrize("typestring,expected", TYPE_PARSE_CASES)
+def test_parsing_type(typestring, expected):
+    assert parse_type(typestring) == expected
+
+
+def test_parsed_types_are_interned():
+    assert parse_type("e") is TYPE_ENTITY
+    assert parse_type("<e, t>").right is TYPE_TRUTH_VALUE
+    assert parse_type("vt").left is TYPE_EVENT
+    assert parse_type("<et, et>") is ComplexType(ET, ET)
 
 
 def test_types_are_AtomicType_class():
@@ -189,65 +187,49 @@ def test_types_are_AtomicType_class():
     assert isinstance(typ.right.right, AtomicType)
 
 
-def test_parsing_big_compound_type():
-    assert parse_type("<<e, t>, <e, <s, t>>>") == ComplexType(
-        ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE),
-        ComplexType(TYPE_ENTITY, ComplexType(TYPE_WORLD, TYPE_TRUTH_VALUE)),
-    )
-
-
-def test_parsing_big_compound_type_with_abbreviations():
-    assert parse_type("<et, <e, st>>") == ComplexType(
-        ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE),
-        ComplexType(TYPE_ENTITY, ComplexType(TYPE_WORLD, TYPE_TRUTH_VALUE)),
-    )
-
-
-def test_parsing_type_missing_opening_bracket():
-    with pytest.raises(ParseError):
-        parse_type("e, t>")
-
-
-def test_parsing_type_missing_closing_bracket():
-    with pytest.raises(ParseError):
-        parse_type("<e, t")
-
-
-def test_parsing_type_trailing_input():
-    with pytest.raises(ParseError):
-        parse_type("<e, t> e")
-
-
-def test_parsing_type_missing_comma():
-    with pytest.raises(ParseError):
+def test_parsing_long_right_nested_type():
+    expected = TYPE_TRUTH_VALUE
+    for _ in range(5000):
+        expected = ComplexType(TYPE_ENTITY, expected)
+    assert parse_type("<e, " * 5000 + "t" + ">" * 5000) is expected
+
+
+# Type strings that are not well-formed, one per kind of syntax error.
+TYPE_PARSE_ERROR_CASES = [
+    # Missing opening bracket
+    "e, t>",
+    # Missing closing bracket
+    "<e, t",
+    # Trailing input
+    "<e, t> e",
+    # Missing comma
+    "<e t>",
+    # Missing output type
+    "<e>",
+    # Invalid abbreviation
+    "evt",
+    # Invalid letter
+    "b",
+    # Unknown token
+    "e?",
+    # Empty and blank strings
+    "",
+    "     \t    \n \r \f",
+]
+
+
+@pytest.mark.parametrize("typestring", TYPE_PARSE_ERROR_CASES)
+def test_parsing_invalid_type(typestring):
+    with pytest.raises(ParseError):
+        parse_type(typestring)
+
+
+def test_type_parse_error_reports_position():
+    with pytest.raises(ParseError) as excinfo:
         parse_type("<e t>")
+    assert "position 3" in str(excinfo.value)
 
 
-def test_parsing_type_missing_output_type():
-    with pytest.raises(ParseError):
-        parse_type("<e>")
-
-
-def test_parsing_type_invalid_abbreviation():
-    with pytest.raises(ParseError):
-        parse_type("evt")
-
-
-def test_parsing_type_invalid_letter():
-    with pytest.raises(ParseError):
-        parse_type("b")
-
-
-def test_parsing_type_unknown_token():
-    with pytest.raises(ParseError):
-        parse_type("e?")
-
-
-def test_parsing_type_empty_string():
-    with pytest.raises(ParseError):
-        parse_type("")
-
-
-def test_parsing_type_blank():
-    with pytest.raises(ParseError):
-        parse_type("     \t    \n \r \f")
+def test_parse_results_are_cached():
+    assert parse_formula("Lx.Good(x)") is parse_formula("Lx.Good(x)")
+    assert parse_type("<et, t>") is parse_type("<et, t>")
@@ -20,6 +20,7 @@ from montague.translator import (
     can_combine,
     combine,
     load_lexicon,
+    step,
     translate_sentence,
 )
 
@@ -27,62 +28,30 @@ from montague.translator import (
 TYPE_ET = ComplexType(TYPE_ENTITY, TYPE_TRUTH_VALUE)
 
 
-def test_translate_is_good(lexicon):
-    # import pdb; pdb.set_trace()
-    nodes = translate_sentence("is good", lexicon)
-
-    assert len(nodes) == 1
-
-    node = nodes[0]
-    assert node.text == "is good"
-    assert node.formula == Lambda("x", Call(Var("Good"), Var("x")))
-    assert node.type == TYPE_ET
-
-
-def test_translate_john_is_good(lexicon):
-    nodes = translate_sentence("John is good", lexicon)
-
-    assert len(nodes) == 1
-
-    node = nodes[0]
-    assert node.text == "John is good"
-    assert node.formula == Call(Var("Good"), Var("john"))
-    assert node.type == TYPE_TRUTH_VALUE
+# Sentences with a single translation, together with its formula and type.
+TRANSLATION_CASES = [
+    ("is good", Lambda("x", Call(Var("Good"), Var("x"))), TYPE_ET),
+    ("John is good", Call(Var("Good"), Var("john")), TYPE_TRUTH_VALUE),
+    ("John is bad", Call(Var("Bad"), Var("john")), TYPE_TRUTH_VALUE),
+    (
+        "every child is good",
+        ForAll("x", IfThen(Call(Var("Child"), Var("x")), Call(Var("Good"), Var("x")))),
+        TYPE_TRUTH_VALUE,
+    ),
+    ("the child", Iota("x", Call(Var("Child"), Var("x"))), TYPE_ENTITY),
+]
 
 
-def test_translate_john_is_bad(lexicon):
-    nodes = translate_sentence("John is bad", lexicon)
+@pytest.mark.parametrize("sentence,formula,type_", TRANSLATION_CASES)
+def test_translate(sentence, formula, type_, lexicon):
+    nodes = translate_sentence(sentence, lexicon)
 
     assert len(nodes) == 1
 
     node = nodes[0]
-    assert node.text == "John is bad"
-    assert node.formula == Call(Var("Bad"), Var("john"))
-    assert node.type == TYPE_TRUTH_VALUE
-
-
-def test_translate_every_child_is_good(lexicon):
-    nodes = translate_sentence("every child is good", lexicon)
-
-    assert len(nodes) == 1
-
-    node = nodes[0]
-    assert node.text == "every child is good"
-    assert node.formula == ForAll(
-        "x", IfThen(Call(Var("Child"), Var("x")), Call(Var("Good"), Var("x")))
-    )
-    assert node.type == TYPE_TRUTH_VALUE
-
-
-def test_translate_the_child(lexicon):
-    nodes = translate_sentence("the child", lexicon)
-
-    assert len(nodes) == 1
-
-    node = nodes[0]
-    assert node.text == "the child"
-    assert node.formula == Iota("x", Call(Var("Child"), Var("x")))
-    assert node.type == TYPE_ENTITY
+    assert node.text == sentence
+    assert node.formula == formula
+    assert node.type == type_
 
 
 def test_translate_unknown_word(lexicon):
@@ -132,6 +101,15 @@ def test_combine_to_saturate_predicate():
     assert node.type == TYPE_TRUTH_VALUE
 
 
+def test_step_reuses_memoized_combinations():
+    memo = {}
+    first = step([pred, entity], memo)
+    second = step([pred, entity], memo)
+    assert len(first) == 1
+    assert first[0][0] is second[0][0]
+    assert first[0][0] == combine(pred, entity)
+
+
 def test_combine_every_child(lexicon):
     every = lexicon["every"][0]
     child = lexicon["child"][0]
@@ -181,6 +159,42 @@ def test_simplify_super_nested_call():
     assert tree.simplify() == And(Var("a"), Var("b"))
 
 
+def test_simplify_call_of_non_lambda():
+    # f((Lx.x)(a), b) -> f(a, b)
+    tree = Call(Call(Var("f"), Call(Lambda("x", Var("x")), Var("a"))), Var("b"))
+    assert tree.simplify() == Call(Call(Var("f"), Var("a")), Var("b"))
+
+
+def test_simplify_does_not_capture_free_variable_in_argument():
+    # (Lx.Ly.x)(y)(b) -> y
+    tree = Call(Call(Lambda("x", Lambda("y", Var("x"))), Var("y")), Var("b"))
+    assert tree.simplify() == Var("y")
+
+
+def test_simplify_returns_same_tree_when_there_is_nothing_to_reduce():
+    tree = Lambda(
+        "x", And(Call(Var("P"), Var("x")), Call(Call(Var("R"), Var("x")), Var("y")))
+    )
+    assert tree.simplify() is tree
+
+
+def test_simplified_tree_is_cached():
+    tree = Call(Lambda("x", Call(Var("Good"), Var("x"))), Var("j"))
+    assert tree.simplify() is tree.simplify()
+
+
+def test_simplify_deeply_nested_tree():
+    tree = Var("a")
+    for _ in range(5000):
+        tree = And(Call(Lambda("x", Var("x")), Var("b")), tree)
+
+    simplified = tree.simplify()
+    for _ in range(5000):
+        assert simplified.left == Var("b")
+        simplified = simplified.right
+    assert simplified == Var("a")
+
+
 def test_simplify_every_child(lexicon):
     # (LP.LQ.Ax.P(x) -> Q(x))(Lx.Child(x)) -> LQ.Ax.Child(x) -> Q(x)
     tree = Call(lexicon["every"][0].formula, lexicon["child"][0].formula)
@@ -189,6 +203,19 @@ def test_simplify_every_child(lexicon):
     )
 
 
+def test_simplify_call_of_deeply_nested_lambda():
+    body = Call(Var("P"), Var("x"))
+    for i in range(5000):
+        body = Lambda("y{}".format(i), body)
+    tree = Call(Lambda("x", body), Var("a"))
+
+    simplified = tree.simplify()
+    for i in reversed(range(5000)):
+        assert simplified.parameter == "y{}".format(i)
+        simplified = simplified.body
+    assert simplified == Call(Var("P"), Var("a"))
+
+
 def test_load_lexicon():
     lexicon = load_lexicon(
         {"John": [{"d": "j", "t": "e"}], "good": [{"d": "Lx.Good(x)", "t": "et"}]}
@@ -199,6 +226,11 @@ def test_load_lexicon():
     }
 
 
+def test_load_lexicon_simplifies_denotations():
+    lexicon = load_lexicon({"good": [{"d": "(Lx.Good(x))(y)", "t": "t"}]})
+    assert lexicon["good"][0].formula == Call(Var("Good"), Var("y"))
+
+
 def test_load_lexicon_missing_denotation_field():
     with pytest.raises(LexiconError) as e:
         load_lexicon({"John": [{"t": "e"}]})